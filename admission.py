@@ -0,0 +1,293 @@
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.routing import Match
+
+# Concurrency limits per lane (how many requests may run at once)
+# Sync API routes run in anyio's threadpool (40 threads by default); keep
+# api_read + api_write at or below that so admitted requests do not queue
+# again for a thread. Health endpoints are async and need no thread.
+LANE_LIMITS = {
+    "health": int(os.getenv("ADMISSION_HEALTH_LIMIT", "16")),
+    "static": int(os.getenv("ADMISSION_STATIC_LIMIT", "64")),
+    "api_read": int(os.getenv("ADMISSION_API_READ_LIMIT", "32")),
+    "api_write": int(os.getenv("ADMISSION_API_WRITE_LIMIT", "8")),
+}
+
+
+def _parse_route_limits(value: str) -> Dict[str, int]:
+    """Parse "GET /api/jobs=8;POST /api/jobs=4" into {"GET /api/jobs": 8, ...}"""
+    limits = {}
+    for item in value.split(";"):
+        route, _, limit = item.rpartition("=")
+        if route.strip():
+            limits[" ".join(route.split())] = int(limit)
+    return limits
+
+
+# Concurrency limit of each API route ("METHOD /path/template"), inside its
+# lane's limit, so one slow route can't hold every slot of its lane
+DEFAULT_ROUTE_LIMIT = int(os.getenv("ADMISSION_ROUTE_LIMIT", "16"))
+ROUTE_LIMITS = {
+    "GET /index.html": 8,
+    "GET /browse-jobs.html": 8,
+    "GET /job-details.html": 8,
+    **_parse_route_limits(os.getenv("ADMISSION_ROUTE_LIMITS", "")),
+}
+
+# Lanes whose requests also take a per-route slot
+ROUTED_LANES = {"api_read", "api_write"}
+
+# Priority lanes are never rate limited per client
+PRIORITY_LANES = {"health", "static"}
+
+# How long a request may wait for a slot before being shed (seconds)
+LATENCY_BUDGET = float(os.getenv("ADMISSION_LATENCY_BUDGET", "0.5"))
+
+# Maximum number of requests waiting for a slot in a single lane
+MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+
+# Token bucket settings per client (requests per second and burst size)
+RATE_PER_SECOND = float(os.getenv("ADMISSION_RATE_PER_SECOND", "20"))
+RATE_BURST = float(os.getenv("ADMISSION_RATE_BURST", "40"))
+
+# Peers (e.g. the reverse proxy) whose X-Forwarded-For header is trusted to
+# identify the client for rate limiting, comma-separated
+TRUSTED_PROXIES = {
+    address.strip() for address in os.getenv("ADMISSION_TRUSTED_PROXIES", "").split(",") if address.strip()
+}
+
+# Drop idle client buckets once we track more than this many clients
+MAX_TRACKED_CLIENTS = 10000
+
+HEALTH_PATHS = {"/", "/health", "/health/admission"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class TokenBucket:
+    """Simple token bucket refilled continuously at `rate` tokens per second"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> Tuple[bool, float]:
+        """
+        Try to take one token
+        Returns (allowed, seconds until the next token is available)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class Lane:
+    """Bounded concurrency slot pool with a bounded wait queue"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+
+
+# Counters exposed through /health/admission
+counters: Dict[str, Dict[str, int]] = {
+    lane: {"admitted": 0, "shed_overload": 0, "shed_rate_limited": 0}
+    for lane in LANE_LIMITS
+}
+
+
+def classify(scope) -> str:
+    """Pick the lane a request belongs to"""
+    path = scope.get("path", "")
+    if path in HEALTH_PATHS:
+        return "health"
+    if path.startswith(("/uploads", "/static")):
+        return "static"
+    if scope.get("method", "GET") in WRITE_METHODS:
+        return "api_write"
+    return "api_read"
+
+
+def route_key(scope) -> Optional[str]:
+    """"METHOD /path/template" of the route a request matches (None if none does)"""
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{scope.get('method', 'GET')} {getattr(route, 'path', '')}"
+    return None
+
+
+def get_stats() -> dict:
+    """Snapshot of admission counters and current lane occupancy"""
+    lanes = {}
+    for name, lane_counters in counters.items():
+        lanes[name] = dict(lane_counters)
+        lanes[name]["limit"] = LANE_LIMITS[name]
+        if _instance is not None:
+            lane = _instance.lanes[name]
+            lanes[name]["active"] = lane.active
+            lanes[name]["waiting"] = lane.waiting
+    routes = {}
+    if _instance is not None:
+        for key, lane in _instance.route_lanes.items():
+            routes[key] = {"limit": lane.limit, "active": lane.active, "waiting": lane.waiting}
+    return {
+        "latency_budget": LATENCY_BUDGET,
+        "shed_total": sum(c["shed_overload"] + c["shed_rate_limited"] for c in counters.values()),
+        "lanes": lanes,
+        "routes": routes,
+    }
+
+
+_instance: Optional["AdmissionControlMiddleware"] = None
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that applies per-lane and per-route concurrency limits
+    and per-client token bucket rate limiting.
+    Requests that would wait longer than the latency budget are shed
+    with 503, clients over their rate get 429. Both carry Retry-After.
+    """
+
+    def __init__(self, app):
+        global _instance
+        self.app = app
+        self.lanes = {name: Lane(name, limit) for name, limit in LANE_LIMITS.items()}
+        self.route_lanes: Dict[str, Lane] = {}  # created on first request to each route
+        self.buckets: Dict[str, TokenBucket] = {}
+        _instance = self
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        lane_name = classify(scope)
+        lane = self.lanes[lane_name]
+        lane_counters = counters[lane_name]
+
+        # Per-client rate limiting (priority lanes are exempt)
+        if lane_name not in PRIORITY_LANES:
+            allowed, retry_after = self._take_token(scope)
+            if not allowed:
+                lane_counters["shed_rate_limited"] += 1
+                await self._reject(send, 429, "Rate limit exceeded", retry_after)
+                return
+
+        # Take a slot of the route, then of the lane, within the latency budget
+        slots = [lane]
+        if lane_name in ROUTED_LANES:
+            route_lane = self._route_lane(scope)
+            if route_lane is not None:
+                slots.insert(0, route_lane)
+        deadline = asyncio.get_running_loop().time() + LATENCY_BUDGET
+        held = []
+        for slot in slots:
+            if not await self._acquire(slot, deadline):
+                for taken in held:
+                    self._release(taken)
+                lane_counters["shed_overload"] += 1
+                await self._reject(send, 503, "Service overloaded", LATENCY_BUDGET)
+                return
+            held.append(slot)
+
+        lane_counters["admitted"] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for slot in held:
+                self._release(slot)
+
+    def _route_lane(self, scope) -> Optional[Lane]:
+        key = route_key(scope)
+        if key is None:
+            return None
+        lane = self.route_lanes.get(key)
+        if lane is None:
+            lane = Lane(key, ROUTE_LIMITS.get(key, DEFAULT_ROUTE_LIMIT))
+            self.route_lanes[key] = lane
+        return lane
+
+    async def _acquire(self, lane: Lane, deadline: float) -> bool:
+        """Wait for a slot until the deadline (False when shed)"""
+        if not lane.semaphore.locked():
+            await lane.semaphore.acquire()
+        else:
+            # Shed immediately when the queue is already too long
+            timeout = deadline - asyncio.get_running_loop().time()
+            if lane.waiting >= MAX_QUEUE or timeout <= 0:
+                return False
+            lane.waiting += 1
+            try:
+                await asyncio.wait_for(lane.semaphore.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                lane.waiting -= 1
+        lane.active += 1
+        return True
+
+    def _release(self, lane: Lane):
+        lane.active -= 1
+        lane.semaphore.release()
+
+    def _client_key(self, scope) -> str:
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        if address in TRUSTED_PROXIES:
+            forwarded = Headers(scope=scope).getlist("x-forwarded-for")
+            hops = [hop.strip() for value in forwarded for hop in value.split(",")]
+            # Rightmost address not added by one of our own proxies
+            for hop in reversed(hops):
+                if hop and hop not in TRUSTED_PROXIES:
+                    return hop
+        return address
+
+    def _take_token(self, scope) -> Tuple[bool, float]:
+        key = self._client_key(scope)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= MAX_TRACKED_CLIENTS:
+                self._prune_buckets()
+            bucket = TokenBucket(RATE_PER_SECOND, RATE_BURST)
+            self.buckets[key] = bucket
+        return bucket.take()
+
+    def _prune_buckets(self):
+        """Forget clients whose bucket has fully refilled (they are idle)"""
+        now = time.monotonic()
+        full_after = RATE_BURST / RATE_PER_SECOND
+        idle = [key for key, bucket in self.buckets.items() if now - bucket.updated >= full_after]
+        for key in idle:
+            del self.buckets[key]
+
+    async def _reject(self, send, status_code: int, detail: str, retry_after: float):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,133 @@
+"""
+Read replica benchmark: compares GET /api/jobs filter combinations answered
+by SQLAlchemy/SQLite against the in-memory columnar replica, on a
+temporary database filled with synthetic jobs.
+
+Usage: python benchmark_read_replica.py [jobs] [repeats]
+"""
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+JOBS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'bench.db'}"
+
+from database import SessionLocal, init_db  # noqa: E402  (needs DATABASE_URL first)
+from models import Job  # noqa: E402
+import read_replica  # noqa: E402
+import routes  # noqa: E402
+
+TYPES = ["On-site", "Hybrid", "Remote"]
+CATEGORIES = ["Accounting", "Sales", "Software", "Marketing", "Engineering", "Design", "Support", "HR"]
+LOCATIONS = ["Cairo", "New Cairo", "Maadi, Cairo", "Giza", "6th of October", "Alexandria", "Mansoura", "Tanta", "Remote"]
+
+# (type, city, category) combinations to measure
+QUERIES = [
+    (None, None, None),
+    ("Remote", None, None),
+    (None, None, "Software"),
+    ("Hybrid", None, "Sales"),
+    (None, "Cairo", None),
+    ("On-site", "Giza", "Engineering"),
+    (None, "Remote", "Design"),
+]
+
+
+def seed(db):
+    random.seed(42)
+    for i in range(JOBS):
+        job = Job(
+            title=f"Job {i}",
+            company=f"Company {i % 500}",
+            location=random.choice(LOCATIONS),
+            experience="2-3 years",
+            salary="20,000 EGP",
+            type=random.choice(TYPES),
+            category=random.choice(CATEGORIES),
+            description=json.dumps(["Description"]),
+            responsibilities=json.dumps(["Responsibility"]),
+            soft_skills=json.dumps(["Skill"]),
+            qualifications=json.dumps(["Qualification"]),
+        )
+        job.update_geocoding()
+        db.add(job)
+    db.commit()
+
+
+def pages(db, type, city, category):
+    """First pages and a deep page, as returned (both paths order by id)"""
+    return [
+        routes.get_jobs(
+            type=type, city=city, category=category, near=None, radius_km=30,
+            skip=skip, limit=100, db=db
+        )
+        for skip in (0, 100, JOBS // 4)
+    ]
+
+
+def time_query(db, type, city, category):
+    timings = []
+    result = None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = routes.get_jobs(
+            type=type, city=city, category=category, near=None, radius_km=30,
+            skip=0, limit=100, db=db
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        seed(db)
+
+        started = time.perf_counter()
+        read_replica.replica.refresh(db)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        print("=" * 72)
+        print(f"Read Replica Benchmark ({JOBS} jobs, median of {REPEATS} runs, limit=100)")
+        print("=" * 72)
+        print(f"Initial replica load: {load_ms:.1f} ms\n")
+        print(f"{'type':<9} {'city':<8} {'category':<12} {'sql ms':>8} {'replica ms':>11} {'speedup':>8}")
+
+        for type, city, category in QUERIES:
+            read_replica.ENABLED = False
+            sql_pages = pages(db, type, city, category)
+            sql_ms, _ = time_query(db, type, city, category)
+            read_replica.ENABLED = True
+            replica_pages = pages(db, type, city, category)
+            replica_ms, _ = time_query(db, type, city, category)
+
+            # Both paths must return the same pages
+            assert sql_pages == replica_pages, f"replica mismatch for {(type, city, category)}"
+
+            print(f"{type or '-':<9} {city or '-':<8} {category or '-':<12} "
+                  f"{sql_ms:>8.2f} {replica_ms:>11.2f} {sql_ms / replica_ms:>7.1f}x")
+
+        # Incremental refresh after a single write
+        job = db.query(Job).first()
+        job.category = "Sales"
+        db.commit()
+        started = time.perf_counter()
+        read_replica.replica.refresh(db)
+        print(f"\nIncremental refresh after one update: {(time.perf_counter() - started) * 1000:.2f} ms")
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Startup benchmark: measures how long a fresh worker process takes to import
+the app and run its startup (lifespan) against a new database (cold, all
+migrations applied) and an up-to-date one (warm, no DDL).
+Also reports what the old import-time create_all() cost on the same database.
+
+Usage: python benchmark_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter so imports are not cached between measurements
+WORKER = """
+import asyncio, json, sys, time
+sys.path.insert(0, {repo!r})
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def startup():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(startup())
+ready = time.perf_counter()
+
+from database import Base, engine
+create_all_started = time.perf_counter()
+Base.metadata.create_all(bind=engine)
+create_all_done = time.perf_counter()
+
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "total_ms": (ready - started) * 1000,
+    "create_all_ms": (create_all_done - create_all_started) * 1000,
+    "migrations": main.app.state.applied_migrations,
+}}))
+"""
+
+
+def run_worker(workdir: str, database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER.format(repo=str(REPO_DIR))],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(label: str, results: list):
+    print(f"\n{label} ({len(results)} runs)")
+    for key in ("import_ms", "startup_ms", "total_ms", "create_all_ms"):
+        values = [result[key] for result in results]
+        print(f"  {key:<14} median {statistics.median(values):8.2f}   min {min(values):8.2f}   max {max(values):8.2f}")
+    print(f"  migrations     {results[0]['migrations'] or 'none'}")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cold, warm = [], []
+
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            database_url = f"sqlite:///{Path(workdir) / 'jobs.db'}"
+            cold.append(run_worker(workdir, database_url))
+            warm.append(run_worker(workdir, database_url))
+
+    print("=" * 60)
+    print("Startup Benchmark")
+    print("=" * 60)
+    summarize("Cold start (new database)", cold)
+    summarize("Warm start (schema up to date)", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Job change log shared by the per-worker caches.
+
+Triggers on `jobs` append the id of every inserted, updated or deleted job
+to `job_changes` (created by migration 4, see migrations.py), so a worker
+can find out what other workers changed since it last looked. Used by the
+fragment cache (fragment_cache.sync) and the read replica.
+"""
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Schema of the change log (migration steps)
+CHANGE_LOG_STEPS = [
+    """CREATE TABLE IF NOT EXISTS job_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_log_insert AFTER INSERT ON jobs
+    BEGIN INSERT INTO job_changes (job_id) VALUES (NEW.id); END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_log_update AFTER UPDATE ON jobs
+    BEGIN INSERT INTO job_changes (job_id) VALUES (NEW.id); END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_log_delete AFTER DELETE ON jobs
+    BEGIN INSERT INTO job_changes (job_id) VALUES (OLD.id); END""",
+]
+
+
+def latest_change_seq(db: Session) -> int:
+    return db.execute(text("SELECT COALESCE(MAX(seq), 0) FROM job_changes")).scalar()
+
+
+def changed_job_ids(db: Session, since_seq: int) -> Optional[List[int]]:
+    """
+    Ids of jobs inserted, updated or deleted after since_seq
+    Returns None if the log was already pruned past since_seq
+    """
+    oldest = db.execute(text("SELECT MIN(seq) FROM job_changes")).scalar()
+    if oldest is None or oldest > since_seq + 1:
+        return None
+    return [
+        row[0] for row in db.execute(
+            text("SELECT DISTINCT job_id FROM job_changes WHERE seq > :seq"), {"seq": since_seq}
+        )
+    ]
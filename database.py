@@ -1,9 +1,11 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from migrations import run_migrations
 
 # SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./jobs.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobs.db")
 
 # Create SQLAlchemy engine
 engine = create_engine(
@@ -24,3 +26,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Apply pending schema migrations (no DDL when the schema is already current)
+def init_db():
+    raw_connection = engine.raw_connection()
+    try:
+        return run_migrations(raw_connection.driver_connection)
+    finally:
+        raw_connection.close()
@@ -1,13 +1,14 @@
 import os
 import uuid
 import shutil
-from typing import Optional
+from typing import List, Optional
 from fastapi import UploadFile
 from pathlib import Path
+from static_assets import precompress_file, compressed_siblings
+from profiling import span
 
 # Define upload directory
 UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -50,9 +51,14 @@ async def save_upload_file(upload_file: UploadFile) -> Optional[str]:
     
     # Save file
     try:
-        with file_path.open("wb") as buffer:
+        UPLOAD_DIR.mkdir(exist_ok=True)
+        with span("upload.write"), file_path.open("wb") as buffer:
             shutil.copyfileobj(upload_file.file, buffer)
         
+        # Store .gz/.br siblings for compressible files
+        with span("upload.precompress"):
+            precompress_file(file_path)
+        
         # Return relative path
         return f"uploads/{unique_filename}"
     except Exception as e:
@@ -61,6 +67,15 @@ async def save_upload_file(upload_file: UploadFile) -> Optional[str]:
     finally:
         await upload_file.close()
 
+def delete_logo_files(logo_urls: List[str]):
+    """
+    Delete logo files that were uploaded to this service
+    External logo URLs are ignored (meant to run as a background task)
+    """
+    for logo_url in logo_urls:
+        if logo_url and logo_url.startswith("/uploads/"):
+            delete_upload_file(logo_url.lstrip("/"))
+
 def delete_upload_file(file_path: str) -> bool:
     """
     Delete uploaded file
@@ -69,7 +84,10 @@ def delete_upload_file(file_path: str) -> bool:
     try:
         full_path = Path(file_path)
         if full_path.exists():
-            full_path.unlink()
+            with span("upload.delete"):
+                for sibling in compressed_siblings(full_path):
+                    sibling.unlink()
+                full_path.unlink()
             return True
         return False
     except Exception as e:
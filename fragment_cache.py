@@ -0,0 +1,99 @@
+"""
+In-memory cache of rendered job fragments (per worker process).
+
+Writes made through this worker invalidate fragments directly. Writes made
+by other workers are picked up from the job_changes log: pages call sync()
+before reading job data, which drops fragments of every job changed since
+the last sync.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from change_log import changed_job_ids, latest_change_seq
+
+# Maximum number of rendered fragments kept in memory
+MAX_FRAGMENTS = 2000
+
+# Fragment kinds cached per job (see pages.py)
+FRAGMENT_KINDS = ("card", "details")
+
+_fragments: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+_lock = threading.Lock()
+_generation = 0  # Bumped on every invalidation so in-flight renders don't store stale HTML
+_synced_seq = -1  # job_changes seq the cache reflects (-1 until the first sync)
+stats: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def sync(db: Session) -> int:
+    """
+    Drop fragments of jobs changed (by any worker) since the last sync
+    Returns the cache generation to pass to get_or_render for data read afterwards
+    """
+    global _synced_seq
+    latest = latest_change_seq(db)
+    with _lock:
+        since = _synced_seq
+        if latest == since:
+            return _generation
+
+    changed = changed_job_ids(db, since) if 0 <= since < latest else None
+    if changed is None:
+        clear()
+    else:
+        for job_id in changed:
+            invalidate_job(job_id)
+
+    with _lock:
+        _synced_seq = latest
+        return _generation
+
+
+def get_or_render(kind: str, job_id: int, render: Callable[[], str], generation: Optional[int] = None) -> str:
+    """
+    Return the cached fragment for (kind, job_id), rendering and storing it on a miss
+    Pass the generation returned by sync() so HTML rendered from data read before
+    a later invalidation is not stored
+    Least recently used fragments are evicted once MAX_FRAGMENTS is reached
+    """
+    key = (kind, job_id)
+    with _lock:
+        html = _fragments.get(key)
+        if html is not None:
+            _fragments.move_to_end(key)
+            stats["hits"] += 1
+            return html
+        stats["misses"] += 1
+        if generation is None:
+            generation = _generation
+
+    html = render()
+
+    with _lock:
+        if generation != _generation:
+            return html
+        _fragments[key] = html
+        _fragments.move_to_end(key)
+        while len(_fragments) > MAX_FRAGMENTS:
+            _fragments.popitem(last=False)
+    return html
+
+
+def invalidate_job(job_id: int):
+    """Drop every cached fragment for a job (call after it is updated or deleted)"""
+    global _generation
+    with _lock:
+        _generation += 1
+        for kind in FRAGMENT_KINDS:
+            _fragments.pop((kind, job_id), None)
+        stats["invalidations"] += 1
+
+
+def clear():
+    """Drop all cached fragments"""
+    global _generation
+    with _lock:
+        _generation += 1
+        _fragments.clear()
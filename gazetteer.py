@@ -0,0 +1,210 @@
+"""
+Offline gazetteer used to normalize free-text job locations into
+canonical places with coordinates, plus a fixed-size lat/lon grid
+used as a spatial index for radius searches.
+"""
+import math
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class Place(NamedTuple):
+    name: str
+    governorate: str
+    lat: float
+    lon: float
+
+
+# (name, governorate, lat, lon, aliases)
+_PLACES = [
+    # Greater Cairo
+    ("Cairo", "Cairo", 30.0444, 31.2357, ["al qahirah", "qahira", "cairo city", "downtown cairo"]),
+    ("New Cairo", "Cairo", 30.0300, 31.4700, ["fifth settlement", "5th settlement", "tagamoa", "new cairo city"]),
+    ("Nasr City", "Cairo", 30.0561, 31.3300, ["madinet nasr", "medinet nasr"]),
+    ("Heliopolis", "Cairo", 30.0911, 31.3225, ["masr el gedida", "misr el gedida"]),
+    ("Maadi", "Cairo", 29.9602, 31.2569, []),
+    ("Zamalek", "Cairo", 30.0609, 31.2197, []),
+    ("Mokattam", "Cairo", 30.0200, 31.3000, []),
+    ("Shorouk", "Cairo", 30.1219, 31.6056, ["shorouk city"]),
+    ("New Administrative Capital", "Cairo", 30.0196, 31.7600, ["new capital", "administrative capital"]),
+    ("Giza", "Giza", 30.0131, 31.2089, ["gizah", "jizah"]),
+    ("6th of October", "Giza", 29.9386, 30.9131, ["6 october", "6th october", "october city", "sixth of october"]),
+    ("Sheikh Zayed", "Giza", 30.0444, 30.9833, ["zayed city", "sheikh zayed city"]),
+    ("Dokki", "Giza", 30.0385, 31.2118, ["doqqi"]),
+    ("Mohandessin", "Giza", 30.0566, 31.2008, ["mohandeseen"]),
+    ("Haram", "Giza", 29.9870, 31.1550, ["pyramids"]),
+    ("Smart Village", "Giza", 30.0715, 31.0170, []),
+    ("Shubra El Kheima", "Qalyubia", 30.1286, 31.2422, []),
+    ("Obour", "Qalyubia", 30.2290, 31.4800, ["obour city"]),
+    ("10th of Ramadan", "Sharqia", 30.2920, 31.7420, ["10th ramadan", "tenth of ramadan", "ramadan city"]),
+    # Delta and Canal
+    ("Alexandria", "Alexandria", 31.2001, 29.9187, ["alex", "al iskandariyah", "iskandariya", "eskendereya"]),
+    ("Borg El Arab", "Alexandria", 30.9167, 29.5333, ["new borg el arab"]),
+    ("Tanta", "Gharbia", 30.7865, 31.0004, []),
+    ("Mahalla", "Gharbia", 30.9700, 31.1667, ["mahalla el kubra"]),
+    ("Mansoura", "Dakahlia", 31.0409, 31.3785, ["al mansurah"]),
+    ("Zagazig", "Sharqia", 30.5877, 31.5020, []),
+    ("Damanhour", "Beheira", 31.0341, 30.4682, []),
+    ("Kafr El Sheikh", "Kafr El Sheikh", 31.1107, 30.9388, []),
+    ("Shibin El Kom", "Monufia", 30.5526, 31.0090, ["shebin el kom"]),
+    ("Sadat City", "Monufia", 30.3700, 30.5300, ["madinat el sadat"]),
+    ("Damietta", "Damietta", 31.4165, 31.8133, ["dumyat", "new damietta"]),
+    ("Port Said", "Port Said", 31.2653, 32.3019, ["bur said"]),
+    ("Ismailia", "Ismailia", 30.5965, 32.2715, []),
+    ("Suez", "Suez", 29.9668, 32.5498, ["as suways"]),
+    ("Ain Sokhna", "Suez", 29.6000, 32.3167, ["sokhna"]),
+    # Upper Egypt
+    ("Fayoum", "Fayoum", 29.3084, 30.8428, ["faiyum"]),
+    ("Beni Suef", "Beni Suef", 29.0661, 31.0994, []),
+    ("Minya", "Minya", 28.0871, 30.7618, []),
+    ("Assiut", "Assiut", 27.1783, 31.1859, ["asyut", "asiut"]),
+    ("Sohag", "Sohag", 26.5591, 31.6957, []),
+    ("Qena", "Qena", 26.1551, 32.7160, []),
+    ("Luxor", "Luxor", 25.6872, 32.6396, ["al uqsur"]),
+    ("Aswan", "Aswan", 24.0889, 32.8998, []),
+    # Coasts
+    ("Hurghada", "Red Sea", 27.2579, 33.8116, ["ghardaqa"]),
+    ("El Gouna", "Red Sea", 27.3942, 33.6782, []),
+    ("Sharm El Sheikh", "South Sinai", 27.9158, 34.3299, ["sharm"]),
+    ("Marsa Matrouh", "Matrouh", 31.3543, 27.2373, ["matrouh", "mersa matruh"]),
+    ("El Alamein", "Matrouh", 30.8333, 28.9500, ["new alamein"]),
+]
+
+# Governorate capitals used when a query names a whole governorate
+_GOVERNORATE_SEATS = {
+    "Cairo": "Cairo",
+    "Giza": "Giza",
+    "Alexandria": "Alexandria",
+}
+
+PLACES: Dict[str, Place] = {}
+_ALIASES: Dict[str, str] = {}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and Arabic articles (el-/al-) before each word"""
+    text = text.lower().replace("-", " ")
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = re.sub(r"\b(?:el|al)\s+(?=\w)", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+for _name, _governorate, _lat, _lon, _aliases in _PLACES:
+    PLACES[_name] = Place(_name, _governorate, _lat, _lon)
+    for _alias in [_name] + _aliases:
+        _ALIASES[normalize_text(_alias)] = _name
+
+# Longest aliases first so "new cairo" wins over "cairo"
+_ALIAS_PATTERNS = [
+    (re.compile(r"\b" + re.escape(alias) + r"\b"), name)
+    for alias, name in sorted(_ALIASES.items(), key=lambda item: -len(item[0]))
+]
+
+
+def resolve(location: Optional[str]) -> Optional[Place]:
+    """
+    Resolve a free-text location to a canonical place
+    Returns None if nothing in the gazetteer matches
+    """
+    if not location:
+        return None
+
+    # Exact match on the whole string, then on each comma-separated part
+    # (most specific part first, e.g. "Maadi, Cairo, Egypt")
+    parts = [location] + location.split(",")
+    for part in parts:
+        name = _ALIASES.get(normalize_text(part))
+        if name:
+            return PLACES[name]
+
+    # Fall back to the longest alias contained in the text
+    text = normalize_text(location)
+    for pattern, name in _ALIAS_PATTERNS:
+        if pattern.search(text):
+            return PLACES[name]
+    return None
+
+
+def places_matching(query: str) -> List[str]:
+    """
+    Canonical place names a city filter should match
+    A governorate seat (e.g. "Cairo") also matches every place in that governorate
+    """
+    place = resolve(query)
+    if not place:
+        return []
+    if _GOVERNORATE_SEATS.get(place.governorate) == place.name:
+        return [p.name for p in PLACES.values() if p.governorate == place.governorate]
+    return [place.name]
+
+
+# ---------------------------------------------------------------------------
+# Spatial grid index
+# ---------------------------------------------------------------------------
+
+# Cell size in degrees (~11 km of latitude)
+CELL_SIZE = 0.1
+GRID_COLUMNS = int(round(360 / CELL_SIZE))
+EARTH_RADIUS_KM = 6371.0
+
+# Above this many candidate cells a radius query just scans geocoded rows
+MAX_CANDIDATE_CELLS = 2500
+
+
+def _cell_row_col(lat: float, lon: float) -> Tuple[int, int]:
+    row = int(math.floor((lat + 90) / CELL_SIZE))
+    col = int(math.floor((lon + 180) / CELL_SIZE)) % GRID_COLUMNS
+    return row, col
+
+
+def grid_cell(lat: float, lon: float) -> int:
+    """Integer id of the grid cell containing a point"""
+    row, col = _cell_row_col(lat, lon)
+    return row * GRID_COLUMNS + col
+
+
+def candidate_cells(lat: float, lon: float, radius_km: float) -> Optional[List[int]]:
+    """
+    Grid cells that may contain points within radius_km of (lat, lon)
+    Returns None if the radius covers too many cells to be worth enumerating
+    """
+    lat_delta = radius_km / 111.0
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat < 0.01 or lat + lat_delta >= 90 or lat - lat_delta <= -90:
+        return None
+    lon_delta = min(180.0, radius_km / (111.0 * cos_lat))
+
+    min_row, min_col = _cell_row_col(lat - lat_delta, lon - lon_delta)
+    max_row, max_col = _cell_row_col(lat + lat_delta, lon + lon_delta)
+
+    if max_col < min_col:  # crosses the antimeridian
+        cols = list(range(min_col, GRID_COLUMNS)) + list(range(0, max_col + 1))
+    else:
+        cols = list(range(min_col, max_col + 1))
+
+    if (max_row - min_row + 1) * len(cols) > MAX_CANDIDATE_CELLS:
+        return None
+    return [row * GRID_COLUMNS + col for row in range(min_row, max_row + 1) for col in cols]
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def geocode_fields(location: Optional[str]) -> dict:
+    """Column values for a job location (all None when it can't be resolved)"""
+    place = resolve(location)
+    if not place:
+        return {"place": None, "latitude": None, "longitude": None, "geo_cell": None}
+    return {
+        "place": place.name,
+        "latitude": place.lat,
+        "longitude": place.lon,
+        "geo_cell": grid_cell(place.lat, place.lon),
+    }
@@ -1,20 +1,50 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from database import engine, Base
+from database import init_db
+from file_utils import UPLOAD_DIR
+from pages import STATIC_DIR
 from routes import router
-import os
+from pages import router as pages_router
+from admission import AdmissionControlMiddleware, get_stats as get_admission_stats
+from static_assets import FrontendStaticFiles, UploadStaticFiles, CompressionMiddleware
+from profiling import ProfilingMiddleware
+import time
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Startup work happens here instead of at import time, so importing the app
+# (tests, scripts, worker boot) does no database or filesystem I/O
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    
+    # Apply pending schema migrations (skipped when the schema version matches)
+    applied = init_db()
+    
+    # Make sure the uploads directory exists
+    UPLOAD_DIR.mkdir(exist_ok=True)
+    
+    app.state.startup_ms = (time.perf_counter() - started) * 1000
+    app.state.applied_migrations = applied
+    print(f"Startup completed in {app.state.startup_ms:.1f} ms (migrations applied: {applied or 'none'})")
+    yield
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Job Service API",
     description="Microservice for job management operations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Compress large JSON/HTML responses (threshold set by COMPRESSION_MIN_SIZE)
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in request profiling (X-Profile header with PROFILE_TOKEN, or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Admission control and load shedding (inside CORS so rejections still carry CORS headers)
+app.add_middleware(AdmissionControlMiddleware)
+
 # Configure CORS for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -24,20 +54,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount uploads directory for serving logo files
-uploads_dir = "uploads"
-if not os.path.exists(uploads_dir):
-    os.makedirs(uploads_dir)
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+# Mount uploads directory for serving logo files (created on startup)
+app.mount("/uploads", UploadStaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
+
+# Frontend assets referenced by the pages (see STATIC_URL in pages.py)
+app.mount("/static", FrontendStaticFiles(directory=STATIC_DIR, check_dir=False), name="static")
 
 # Include routers
 app.include_router(router)
+app.include_router(pages_router)
 
-# Health check endpoint
+# Health check endpoints run on the event loop (async def), so they never
+# wait for a threadpool thread behind busy API requests
 @app.get("/", tags=["health"])
-def health_check():
+async def health_check():
     return {"status": "healthy", "service": "Job Service API"}
 
 @app.get("/health", tags=["health"])
-def health():
+async def health():
     return {"status": "ok"}
+
+@app.get("/health/admission", tags=["health"])
+async def admission_stats():
+    return get_admission_stats()
@@ -0,0 +1,197 @@
+"""
+Versioned, checksummed schema migrations for the SQLite database.
+
+The current schema version is kept in SQLite's `PRAGMA user_version`, so a
+worker whose database is already up to date only pays for one pragma read.
+Applied migrations are recorded in `schema_migrations` with a checksum of
+their definition; editing a migration after it has been applied is an error.
+SQL steps are checksummed by their text, Python steps by the identifier
+given with @python_step (bump its version when the step's behavior changes).
+"""
+import hashlib
+import sqlite3
+import time
+from typing import Callable, List, NamedTuple, Union
+
+from change_log import CHANGE_LOG_STEPS
+from gazetteer import geocode_fields
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    steps: List[Union[str, Callable[[sqlite3.Connection], None]]]
+
+
+def python_step(version: int):
+    """Give a Python step the stable identifier it is checksummed by (qualified name + version)"""
+    def decorate(step: Callable[[sqlite3.Connection], None]):
+        step.checksum_id = f"{step.__qualname__}@{version}"
+        return step
+    return decorate
+
+
+def add_column_if_missing(table: str, column: str, column_type: str):
+    """Step that adds a column unless it already exists"""
+    def step(conn: sqlite3.Connection):
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    step.__doc__ = f"add column {table}.{column} {column_type}"
+    step.checksum_id = step.__doc__
+    return step
+
+
+@python_step(version=1)
+def geocode_existing_jobs(conn: sqlite3.Connection):
+    """Resolve locations of jobs written before geocoding existed"""
+    rows = conn.execute("SELECT id, location FROM jobs WHERE place IS NULL").fetchall()
+    for job_id, location in rows:
+        fields = geocode_fields(location)
+        if fields["place"] is None:
+            continue
+        conn.execute(
+            "UPDATE jobs SET place = ?, latitude = ?, longitude = ?, geo_cell = ? WHERE id = ?",
+            (fields["place"], fields["latitude"], fields["longitude"], fields["geo_cell"], job_id),
+        )
+
+
+MIGRATIONS = [
+    Migration(1, "create jobs table", [
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            company VARCHAR(255) NOT NULL,
+            location VARCHAR(255) NOT NULL,
+            experience VARCHAR(100) NOT NULL,
+            salary VARCHAR(100) NOT NULL,
+            type VARCHAR(50) NOT NULL,
+            category VARCHAR(100) NOT NULL,
+            logo_url VARCHAR(500),
+            description TEXT NOT NULL,
+            responsibilities TEXT NOT NULL,
+            soft_skills TEXT NOT NULL,
+            qualifications TEXT NOT NULL,
+            created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+            updated_at DATETIME,
+            PRIMARY KEY (id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_title ON jobs (title)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_company ON jobs (company)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_type ON jobs (type)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_category ON jobs (category)",
+    ]),
+    Migration(2, "geocoded job locations", [
+        add_column_if_missing("jobs", "place", "VARCHAR(255)"),
+        add_column_if_missing("jobs", "latitude", "FLOAT"),
+        add_column_if_missing("jobs", "longitude", "FLOAT"),
+        add_column_if_missing("jobs", "geo_cell", "INTEGER"),
+        "CREATE INDEX IF NOT EXISTS ix_jobs_place ON jobs (place)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_geo_cell ON jobs (geo_cell)",
+        geocode_existing_jobs,
+    ]),
+    Migration(3, "index jobs by creation time", [
+        "CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs (created_at)",
+    ]),
+    Migration(4, "job change log", CHANGE_LOG_STEPS),
+    # Every 1000th change drops entries more than 10000 changes old, so the
+    # log stays bounded whether or not a read replica is following it
+    Migration(5, "prune job change log", [
+        """CREATE TRIGGER IF NOT EXISTS job_changes_prune AFTER INSERT ON job_changes
+        WHEN NEW.seq % 1000 = 0
+        BEGIN DELETE FROM job_changes WHERE seq <= NEW.seq - 10000; END""",
+        "DELETE FROM job_changes WHERE seq <= (SELECT MAX(seq) FROM job_changes) - 10000",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def checksum(migration: Migration) -> str:
+    """Checksum of a migration's definition (SQL text, or checksum_id for Python steps)"""
+    digest = hashlib.sha256(f"{migration.version}:{migration.name}".encode())
+    for step in migration.steps:
+        if isinstance(step, str):
+            text = " ".join(step.split())
+        else:
+            text = getattr(step, "checksum_id", None)
+            if text is None:
+                raise TypeError(f"Python step {step.__qualname__} of migration {migration.version} needs @python_step")
+        digest.update(text.encode())
+    return digest.hexdigest()
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn: sqlite3.Connection) -> List[int]:
+    """
+    Bring the database schema up to LATEST_VERSION
+    Returns the versions that were applied (empty when already up to date)
+    """
+    # Fast path: no DDL or reflection when the schema already matches
+    if get_schema_version(conn) == LATEST_VERSION:
+        return []
+
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None  # manage the transaction ourselves
+    try:
+        # Take the write lock so concurrent workers migrate one at a time
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            applied = _apply_pending(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = previous_isolation
+    return applied
+
+
+def _apply_pending(conn: sqlite3.Connection) -> List[int]:
+    version = get_schema_version(conn)
+    if version > LATEST_VERSION:
+        raise RuntimeError(f"Database schema version {version} is newer than this code ({LATEST_VERSION})")
+    if version == LATEST_VERSION:
+        return []  # another worker migrated while we waited for the lock
+
+    conn.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        applied_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+    )""")
+
+    recorded = {
+        row[0]: row[1]
+        for row in conn.execute("SELECT version, checksum FROM schema_migrations")
+    }
+
+    applied = []
+    for migration in MIGRATIONS:
+        expected = checksum(migration)
+        if migration.version in recorded:
+            if recorded[migration.version] != expected:
+                raise RuntimeError(
+                    f"Migration {migration.version} ({migration.name}) was changed after it was applied"
+                )
+            continue
+
+        started = time.perf_counter()
+        for step in migration.steps:
+            if isinstance(step, str):
+                conn.execute(step)
+            else:
+                step(conn)
+        conn.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (?, ?, ?)",
+            (migration.version, migration.name, expected),
+        )
+        print(f"Applied migration {migration.version} ({migration.name}) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        applied.append(migration.version)
+
+    conn.execute(f"PRAGMA user_version = {LATEST_VERSION}")
+    return applied
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float
 from sqlalchemy.sql import func
 from database import Base
+from gazetteer import geocode_fields
 import json
 
 class Job(Base):
@@ -16,6 +17,12 @@ class Job(Base):
     category = Column(String(100), nullable=False, index=True)  # Accounting, Sales, Software, etc.
     logo_url = Column(String(500), nullable=True)
     
+    # Location normalized against the gazetteer (None if it couldn't be resolved)
+    place = Column(String(255), nullable=True, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True, index=True)  # Spatial grid cell id
+    
     # JSON fields stored as TEXT
     description = Column(Text, nullable=False)  # JSON array as string
     responsibilities = Column(Text, nullable=False)  # JSON array as string
@@ -23,9 +30,14 @@ class Job(Base):
     qualifications = Column(Text, nullable=False)  # JSON array as string
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    def update_geocoding(self):
+        """Resolve location into place/latitude/longitude/geo_cell"""
+        for field, value in geocode_fields(self.location).items():
+            setattr(self, field, value)
+    
     def to_dict(self):
         """Convert model to dictionary with JSON parsing for array fields"""
         return {
@@ -0,0 +1,96 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse
+from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_db
+from models import Job
+from routes import get_jobs, get_similar_jobs
+import fragment_cache
+
+# Server-rendered pages. Job data is inlined for first paint (as HTML) and
+# as window.__INITIAL_DATA__ so the page scripts can skip their initial API calls.
+router = APIRouter(tags=["pages"], include_in_schema=False)
+templates = Jinja2Templates(directory="templates")
+
+# Frontend assets (css/js/images): served from STATIC_DIR at /static, or from
+# wherever STATIC_URL points (e.g. a CDN)
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_URL = os.getenv("STATIC_URL", "/static").rstrip("/")
+templates.env.globals["static_url"] = STATIC_URL
+
+# Number of job cards shown on the home page
+FEATURED_JOBS = 8
+
+
+def render_job_card(job: dict, generation: int) -> str:
+    """Cached HTML for a job card (listing item)"""
+    return fragment_cache.get_or_render(
+        "card", job["id"], lambda: templates.get_template("_job_card.html").render(job=job), generation
+    )
+
+
+def render_job_details(job: dict, generation: int) -> str:
+    """Cached HTML for the main body of the job details page"""
+    return fragment_cache.get_or_render(
+        "details", job["id"], lambda: templates.get_template("_job_details.html").render(job=job), generation
+    )
+
+
+def render_job_cards(jobs: List[dict], generation: int) -> Markup:
+    return Markup("".join(render_job_card(job, generation) for job in jobs))
+
+
+def list_jobs(db: Session, limit: int) -> List[dict]:
+    """Unfiltered job listing, same as GET /api/jobs"""
+    return get_jobs(
+        type=None, city=None, category=None, near=None, radius_km=30,
+        skip=0, limit=limit, db=db
+    )
+
+
+@router.get("/index.html", response_class=HTMLResponse)
+def index_page(request: Request, db: Session = Depends(get_db)):
+    generation = fragment_cache.sync(db)
+    jobs = list_jobs(db, FEATURED_JOBS)
+    return templates.TemplateResponse("index.html", {
+        "request": request,
+        "job_cards": render_job_cards(jobs, generation),
+        "initial_data": {"jobs": jobs},
+    })
+
+
+@router.get("/browse-jobs.html", response_class=HTMLResponse)
+def browse_jobs_page(request: Request, db: Session = Depends(get_db)):
+    generation = fragment_cache.sync(db)
+    jobs = list_jobs(db, 100)
+    return templates.TemplateResponse("browse-jobs.html", {
+        "request": request,
+        "job_cards": render_job_cards(jobs, generation),
+        "initial_data": {"jobs": jobs},
+    })
+
+
+@router.get("/job-details.html", response_class=HTMLResponse)
+def job_details_page(
+    request: Request,
+    id: int = Query(..., description="Job ID"),
+    db: Session = Depends(get_db)
+):
+    generation = fragment_cache.sync(db)
+    job = db.query(Job).filter(Job.id == id).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job_data = job.to_dict()
+    similar_jobs = get_similar_jobs(id, limit=5, db=db)
+    return templates.TemplateResponse("job-details.html", {
+        "request": request,
+        "job_details": Markup(render_job_details(job_data, generation)),
+        "similar_jobs": similar_jobs,
+        "initial_data": {"job": job_data, "similarJobs": similar_jobs},
+    })
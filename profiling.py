@@ -0,0 +1,252 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it carries an `X-Profile` header equal to
+PROFILE_TOKEN (header profiling is off while no token is configured) or is
+picked by PROFILE_SAMPLE_RATE.
+While it runs, a background thread samples the stacks of the threads
+working on it (the event loop thread, plus threadpool threads inside a
+span). Named spans (`with span("db.commit"):`) show up as the outermost
+frames of the sampled stacks and in the `Server-Timing` response header.
+
+Each profile is written to PROFILE_DIR as:
+- <id>.folded      collapsed stacks (flamegraph.pl, speedscope, inferno)
+- <id>.spans.json  request info and span timings
+Profiled responses carry an `X-Profile-Id` header with <id>.
+Only the newest PROFILE_MAX_KEPT profiles are kept; older ones are deleted
+when a new profile is written.
+
+Samples of the event loop thread may include other requests that were
+running concurrently on the loop.
+"""
+import asyncio
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+PROFILE_HEADER = "x-profile"
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_KEPT = int(os.getenv("PROFILE_MAX_KEPT", "500"))
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.002"))
+
+# Requests profiled at the same time (others run unprofiled)
+MAX_ACTIVE_PROFILES = 4
+
+# Deepest stack recorded per sample (outermost frames are dropped)
+MAX_STACK_DEPTH = 128
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.samples: Counter = Counter()
+        self.spans: List[dict] = []
+        self.lock = threading.Lock()
+        # Thread ident -> stack of open span names on that thread
+        self.threads: Dict[int, List[str]] = {}
+
+    def enter(self, name: str):
+        ident = threading.get_ident()
+        with self.lock:
+            self.threads.setdefault(ident, []).append(name)
+
+    def exit(self, name: str, started: float):
+        ident = threading.get_ident()
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            stack = self.threads.get(ident)
+            if stack:
+                stack.pop()
+                if not stack:
+                    del self.threads[ident]
+            self.spans.append({
+                "name": name,
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round(duration_ms, 3),
+            })
+
+    def sample(self, frames):
+        with self.lock:
+            threads = [(ident, list(stack)) for ident, stack in self.threads.items()]
+        for ident, span_stack in threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.extend(f"[{name}]" for name in reversed(span_stack))
+            self.samples[";".join(part.replace(";", ",") for part in reversed(stack))] += 1
+
+    def server_timing(self) -> str:
+        """Span durations as a Server-Timing header value"""
+        with self.lock:
+            totals: Dict[str, float] = {}
+            for recorded in self.spans:
+                totals[recorded["name"]] = totals.get(recorded["name"], 0.0) + recorded["duration_ms"]
+        return ", ".join(f"{name.replace('.', '-')};dur={duration:.3f}" for name, duration in totals.items())
+
+    def write(self, directory: Path, status_code: Optional[int]):
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / f"{self.id}.folded", "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(directory / f"{self.id}.spans.json", "w") as f:
+            json.dump({
+                "id": self.id,
+                "method": self.method,
+                "path": self.path,
+                "status_code": status_code,
+                "duration_ms": round(self.duration_ms, 3),
+                "samples": sum(self.samples.values()),
+                "sample_interval_ms": SAMPLE_INTERVAL * 1000,
+                "spans": self.spans,
+            }, f, indent=2)
+        prune_profiles(directory, PROFILE_MAX_KEPT)
+
+
+def prune_profiles(directory: Path, keep: int):
+    """Delete all but the newest `keep` profiles in directory"""
+    profiles = []
+    for path in directory.glob("*.spans.json"):
+        try:
+            profiles.append((path.stat().st_mtime_ns, path.name))
+        except FileNotFoundError:
+            continue  # pruned by a concurrent write
+    profiles.sort(reverse=True)
+    for _, name in profiles[keep:]:
+        profile_id = name.removesuffix(".spans.json")
+        for suffix in (".spans.json", ".folded"):
+            (directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+
+class Sampler:
+    """Background thread sampling stacks for all active profiles"""
+
+    def __init__(self):
+        self.active: List[RequestProfile] = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile):
+        with self.lock:
+            self.active.append(profile)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def remove(self, profile: RequestProfile):
+        with self.lock:
+            if profile in self.active:
+                self.active.remove(profile)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                profiles = list(self.active)
+            if not profiles:
+                # Sleep until the next profiled request
+                self.wakeup.clear()
+                self.wakeup.wait()
+                continue
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(SAMPLE_INTERVAL)
+
+
+sampler = Sampler()
+
+
+@contextmanager
+def span(name: str):
+    """Record a named phase of the current request (no-op unless it is being profiled)"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit(name, started)
+
+
+def should_profile(scope) -> bool:
+    if len(sampler.active) >= MAX_ACTIVE_PROFILES:
+        return False
+    header = Headers(scope=scope).get(PROFILE_HEADER)
+    # Compared as bytes: compare_digest rejects non-ASCII str (headers are latin-1)
+    if header is not None and PROFILE_TOKEN and hmac.compare_digest(header.encode("latin-1"), PROFILE_TOKEN.encode()):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests selected by header or sampling rate"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope.get("method", ""), scope.get("path", ""))
+        status_code = None
+
+        async def send_with_profile(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers["x-profile-id"] = profile.id
+                timing = profile.server_timing()
+                if timing:
+                    headers.append("server-timing", timing)
+            await send(message)
+
+        token = _current_profile.set(profile)
+        profile.enter("request")  # the event loop thread, for the whole request
+        sampler.add(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profile.exit("request", started)
+            sampler.remove(profile)
+            _current_profile.reset(token)
+            profile.duration_ms = (time.perf_counter() - started) * 1000
+            try:
+                await asyncio.to_thread(profile.write, PROFILE_DIR, status_code)
+            except OSError as e:
+                print(f"Error writing profile {profile.id}: {e}")
@@ -0,0 +1,248 @@
+"""
+Optional in-memory columnar read replica for job listings.
+
+Listing columns are kept in arrays indexed by row position. `type`,
+`category`, `location` and `place` are dictionary-encoded, and each
+distinct value has a bitmap (a Python int, bit N = row N) so filter
+combinations are answered by bitmap intersection.
+
+The replica follows the `job_changes` log (see change_log.py; pruned by a
+trigger from migrations.py): before each read it checks the latest change sequence
+and reloads only the jobs changed since the last refresh, or everything if
+the log was pruned past its position.
+
+Enable with READ_REPLICA=1.
+"""
+import os
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from change_log import changed_job_ids, latest_change_seq
+from gazetteer import places_matching
+
+ENABLED = os.getenv("READ_REPLICA", "0").lower() in ("1", "true", "yes")
+
+# Rebuild from scratch once this fraction of rows are deleted tombstones
+MAX_TOMBSTONE_RATIO = 0.25
+
+LISTING_COLUMNS = "id, title, company, location, experience, salary, type, category, logo_url, place"
+
+
+class DictionaryColumn:
+    """Dictionary-encoded column with one bitmap per distinct value"""
+
+    def __init__(self):
+        self.codes = array("I")
+        self.values: List[Optional[str]] = []
+        self.lookup: Dict[Optional[str], int] = {}
+        self.bitmaps: List[int] = []
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+            self.bitmaps.append(0)
+        return code
+
+    def append(self, row: int, value: Optional[str]):
+        code = self.encode(value)
+        self.codes.append(code)
+        self.bitmaps[code] |= 1 << row
+
+    def set(self, row: int, value: Optional[str]):
+        old_code = self.codes[row]
+        self.bitmaps[old_code] &= ~(1 << row)
+        code = self.encode(value)
+        self.codes[row] = code
+        self.bitmaps[code] |= 1 << row
+
+    def clear(self, row: int):
+        self.bitmaps[self.codes[row]] &= ~(1 << row)
+
+    def get(self, row: int) -> Optional[str]:
+        return self.values[self.codes[row]]
+
+    def bitmap_for(self, value: str) -> int:
+        code = self.lookup.get(value)
+        return self.bitmaps[code] if code is not None else 0
+
+    def bitmap_where(self, predicate) -> int:
+        """Union of bitmaps of all distinct values matching predicate"""
+        bitmap = 0
+        for code, value in enumerate(self.values):
+            if value is not None and predicate(value):
+                bitmap |= self.bitmaps[code]
+        return bitmap
+
+
+class JobReplica:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.applied_seq = -1  # -1 means never loaded
+        self._reset()
+
+    def _reset(self):
+        self.ids = array("q")
+        self.row_of: Dict[int, int] = {}
+        self.live = 0  # bitmap of rows that are not deleted
+        self.deleted = 0
+        self.title: List[str] = []
+        self.company: List[str] = []
+        self.experience: List[str] = []
+        self.salary: List[str] = []
+        self.logo_url: List[Optional[str]] = []
+        self.type = DictionaryColumn()
+        self.category = DictionaryColumn()
+        self.location = DictionaryColumn()
+        self.place = DictionaryColumn()
+
+    # -- loading -----------------------------------------------------------
+
+    def _append(self, record):
+        row = len(self.ids)
+        self.ids.append(record.id)
+        self.row_of[record.id] = row
+        self.live |= 1 << row
+        self.title.append(record.title)
+        self.company.append(record.company)
+        self.experience.append(record.experience)
+        self.salary.append(record.salary)
+        self.logo_url.append(record.logo_url)
+        self.type.append(row, record.type)
+        self.category.append(row, record.category)
+        self.location.append(row, record.location)
+        self.place.append(row, record.place)
+
+    def _update(self, row: int, record):
+        self.title[row] = record.title
+        self.company[row] = record.company
+        self.experience[row] = record.experience
+        self.salary[row] = record.salary
+        self.logo_url[row] = record.logo_url
+        self.type.set(row, record.type)
+        self.category.set(row, record.category)
+        self.location.set(row, record.location)
+        self.place.set(row, record.place)
+
+    def _delete(self, job_id: int):
+        row = self.row_of.pop(job_id)
+        self.live &= ~(1 << row)
+        for column in (self.type, self.category, self.location, self.place):
+            column.clear(row)
+        self.deleted += 1
+
+    def _full_load(self, db: Session, latest_seq: int):
+        self._reset()
+        for record in db.execute(text(f"SELECT {LISTING_COLUMNS} FROM jobs ORDER BY id")):
+            self._append(record)
+        self.applied_seq = latest_seq
+
+    def _apply_changes(self, db: Session, latest_seq: int) -> bool:
+        """
+        Reload only the jobs changed since applied_seq
+        Returns False if a full reload is needed instead
+        """
+        changed_ids = changed_job_ids(db, self.applied_seq)
+        if changed_ids is None:
+            return False  # change log was pruned past our position
+
+        records = {}
+        for start in range(0, len(changed_ids), 500):
+            batch = changed_ids[start:start + 500]
+            params = {f"id{i}": job_id for i, job_id in enumerate(batch)}
+            placeholders = ", ".join(f":{name}" for name in params)
+            for record in db.execute(
+                text(f"SELECT {LISTING_COLUMNS} FROM jobs WHERE id IN ({placeholders}) ORDER BY id"), params
+            ):
+                records[record.id] = record
+
+        max_id = self.ids[-1] if len(self.ids) else 0
+        for job_id in sorted(changed_ids):
+            record = records.get(job_id)
+            row = self.row_of.get(job_id)
+            if record is None:
+                if row is not None:
+                    self._delete(job_id)
+            elif row is not None:
+                self._update(row, record)
+            elif job_id > max_id:
+                self._append(record)
+                max_id = job_id
+            else:
+                return False  # new row in the middle of the id order
+
+        if self.deleted > len(self.ids) * MAX_TOMBSTONE_RATIO:
+            return False
+        self.applied_seq = latest_seq
+        return True
+
+    def refresh(self, db: Session):
+        """Bring the replica up to date with the change log"""
+        latest_seq = latest_change_seq(db)
+        if latest_seq == self.applied_seq:
+            return
+
+        if self.applied_seq < 0 or not self._apply_changes(db, latest_seq):
+            self._full_load(db, latest_seq)
+
+    # -- querying ----------------------------------------------------------
+
+    def list_jobs(
+        self,
+        db: Session,
+        type: Optional[str],
+        city: Optional[str],
+        category: Optional[str],
+        skip: int,
+        limit: int,
+    ) -> List[dict]:
+        """Same result as the SQL path of GET /api/jobs (without `near`)"""
+        with self.lock:
+            self.refresh(db)
+
+            bitmap = self.live
+            if type:
+                bitmap &= self.type.bitmap_for(type)
+            if city:
+                places = places_matching(city)
+                if places:
+                    place_bitmap = 0
+                    for place in places:
+                        place_bitmap |= self.place.bitmap_for(place)
+                    bitmap &= place_bitmap
+                else:
+                    # Case-insensitive like SQLite's LIKE
+                    needle = city.lower()
+                    bitmap &= self.location.bitmap_where(lambda value: needle in value.lower())
+            if category:
+                bitmap &= self.category.bitmap_for(category)
+
+            result = []
+            while bitmap and len(result) < limit:
+                lowest = bitmap & -bitmap
+                bitmap ^= lowest
+                if skip:
+                    skip -= 1
+                    continue
+                row = lowest.bit_length() - 1
+                result.append({
+                    "id": self.ids[row],
+                    "title": self.title[row],
+                    "company": self.company[row],
+                    "location": self.location.get(row),
+                    "experience": self.experience[row],
+                    "salary": self.salary[row],
+                    "type": self.type.get(row),
+                    "category": self.category.get(row),
+                    "logoUrl": self.logo_url[row],
+                })
+            return result
+
+
+replica = JobReplica()
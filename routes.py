@@ -1,54 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, Form
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import json
 
 from database import get_db
 from models import Job
-from schemas import JobCreate, JobUpdate, JobResponse, JobListItem
-from file_utils import save_upload_file, delete_upload_file
+from schemas import JobCreate, JobUpdate, JobResponse, JobListItem, JobBulkSelection, JobBulkUpdate, JobBulkDelete
+from file_utils import save_upload_file, delete_upload_file, delete_logo_files
+from gazetteer import places_matching, candidate_cells, distance_km, geocode_fields
+import fragment_cache
+import read_replica
+from profiling import span
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
+# Rows changed per statement in bulk operations (keeps each write transaction short)
+BULK_BATCH_SIZE = 500
+
+# Fields stored as JSON strings
+LIST_FIELDS = ["description", "responsibilities", "soft_skills", "qualifications"]
+
 @router.get("/", response_model=List[JobListItem])
 def get_jobs(
     type: Optional[str] = Query(None, description="Filter by job type (On-site, Hybrid, Remote)"),
     city: Optional[str] = Query(None, description="Filter by city/location"),
     category: Optional[str] = Query(None, description="Filter by job category"),
+    near: Optional[str] = Query(None, description="Only jobs near a point, as 'lat,lon'"),
+    radius_km: float = Query(30, gt=0, le=1000, description="Search radius in km (used with near)"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Maximum number of records to return"),
     db: Session = Depends(get_db)
 ):
     """
     Get all jobs with optional filtering and pagination
+    When `near` is given, results are ordered by distance
     """
+    # Answer from the in-memory replica when enabled (radius search stays on SQL)
+    if read_replica.ENABLED and not near:
+        with span("replica.query"):
+            return read_replica.replica.list_jobs(db, type, city, category, skip, limit)
+    
     query = db.query(Job)
     
     # Apply filters
     if type:
         query = query.filter(Job.type == type)
     if city:
-        query = query.filter(Job.location.contains(city))
+        # Match normalized places through the place index (e.g. "Cairo" also
+        # matches "New Cairo", "Maadi"); substring match for unknown cities
+        places = places_matching(city)
+        if places:
+            query = query.filter(Job.place.in_(places))
+        else:
+            query = query.filter(Job.location.contains(city, autoescape=True))
     if category:
         query = query.filter(Job.category == category)
     
-    # Get jobs with pagination
-    jobs = query.offset(skip).limit(limit).all()
+    if near:
+        try:
+            lat, lon = (float(value) for value in near.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="near must be in the format 'lat,lon'")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise HTTPException(status_code=400, detail="near is out of range")
+        
+        # Only examine jobs in grid cells that can be within the radius
+        cells = candidate_cells(lat, lon, radius_km)
+        if cells is not None:
+            query = query.filter(Job.geo_cell.in_(cells))
+        else:
+            query = query.filter(Job.geo_cell.isnot(None))
+        
+        # Exact distance check on coordinates only, nearest first
+        in_range = []
+        with span("db.query"):
+            candidates = query.with_entities(Job.id, Job.latitude, Job.longitude).all()
+        for job_id, job_lat, job_lon in candidates:
+            distance = distance_km(lat, lon, job_lat, job_lon)
+            if distance <= radius_km:
+                in_range.append((distance, job_id))
+        in_range.sort()
+        page_ids = [job_id for _, job_id in in_range[skip:skip + limit]]
+        
+        # Load full rows for the requested page only
+        with span("db.query"):
+            rows = {job.id: job for job in db.query(Job).filter(Job.id.in_(page_ids))} if page_ids else {}
+        jobs = [rows[job_id] for job_id in page_ids if job_id in rows]
+    else:
+        # Get jobs with pagination (ordered by id so pages are stable
+        # whichever index SQLite picks for the filters)
+        with span("db.query"):
+            jobs = query.order_by(Job.id).offset(skip).limit(limit).all()
     
     # Convert to response format
-    result = []
-    for job in jobs:
-        result.append({
-            "id": job.id,
-            "title": job.title,
-            "company": job.company,
-            "location": job.location,
-            "experience": job.experience,
-            "salary": job.salary,
-            "type": job.type,
-            "category": job.category,
-            "logoUrl": job.logo_url
-        })
+    with span("serialize"):
+        result = []
+        for job in jobs:
+            result.append({
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "experience": job.experience,
+                "salary": job.salary,
+                "type": job.type,
+                "category": job.category,
+                "logoUrl": job.logo_url
+            })
     
     return result
 
@@ -57,12 +116,14 @@ def get_job(job_id: int, db: Session = Depends(get_db)):
     """
     Get a specific job by ID with full details
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    with span("db.query"):
+        job = db.query(Job).filter(Job.id == job_id).first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return job.to_dict()
+    with span("serialize"):
+        return job.to_dict()
 
 @router.get("/{job_id}/similar", response_model=List[JobListItem])
 def get_similar_jobs(
@@ -73,32 +134,34 @@ def get_similar_jobs(
     """
     Get similar jobs based on category (excluding the current job)
     """
-    # Get the current job to find its category
-    current_job = db.query(Job).filter(Job.id == job_id).first()
-    
-    if not current_job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Find similar jobs in the same category
-    similar_jobs = db.query(Job).filter(
-        Job.category == current_job.category,
-        Job.id != job_id
-    ).limit(limit).all()
+    with span("db.query"):
+        # Get the current job to find its category
+        current_job = db.query(Job).filter(Job.id == job_id).first()
+        
+        if not current_job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        # Find similar jobs in the same category
+        similar_jobs = db.query(Job).filter(
+            Job.category == current_job.category,
+            Job.id != job_id
+        ).limit(limit).all()
     
     # Convert to response format
-    result = []
-    for job in similar_jobs:
-        result.append({
-            "id": job.id,
-            "title": job.title,
-            "company": job.company,
-            "location": job.location,
-            "experience": job.experience,
-            "salary": job.salary,
-            "type": job.type,
-            "category": job.category,
-            "logoUrl": job.logo_url
-        })
+    with span("serialize"):
+        result = []
+        for job in similar_jobs:
+            result.append({
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "experience": job.experience,
+                "salary": job.salary,
+                "type": job.type,
+                "category": job.category,
+                "logoUrl": job.logo_url
+            })
     
     return result
 
@@ -122,12 +185,16 @@ def create_job(job: JobCreate, db: Session = Depends(get_db)):
         soft_skills=json.dumps(job.soft_skills),
         qualifications=json.dumps(job.qualifications)
     )
+    new_job.update_geocoding()
     
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    with span("db.commit"):
+        db.commit()
+    with span("db.refresh"):
+        db.refresh(new_job)
     
-    return new_job.to_dict()
+    with span("serialize"):
+        return new_job.to_dict()
 
 @router.post("/with-logo", response_model=dict, status_code=201)
 async def create_job_with_logo(
@@ -170,7 +237,8 @@ async def create_job_with_logo(
     logo_url = None
     if logo:
         try:
-            logo_url = await save_upload_file(logo)
+            with span("upload"):
+                logo_url = await save_upload_file(logo)
             if logo_url:
                 # Convert to full URL path
                 logo_url = f"/{logo_url}"  # This will be served by FastAPI static files
@@ -178,10 +246,11 @@ async def create_job_with_logo(
             raise HTTPException(status_code=400, detail=str(e))
     
     # Parse JSON strings or plain text
-    description_list = parse_list_field("description", description)
-    responsibilities_list = parse_list_field("responsibilities", responsibilities)
-    soft_skills_list = parse_list_field("soft_skills", soft_skills)
-    qualifications_list = parse_list_field("qualifications", qualifications)
+    with span("validate"):
+        description_list = parse_list_field("description", description)
+        responsibilities_list = parse_list_field("responsibilities", responsibilities)
+        soft_skills_list = parse_list_field("soft_skills", soft_skills)
+        qualifications_list = parse_list_field("qualifications", qualifications)
     
     # Create job
     new_job = Job(
@@ -198,12 +267,16 @@ async def create_job_with_logo(
         soft_skills=json.dumps(soft_skills_list),
         qualifications=json.dumps(qualifications_list)
     )
+    new_job.update_geocoding()
     
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    with span("db.commit"):
+        db.commit()
+    with span("db.refresh"):
+        db.refresh(new_job)
     
-    return new_job.to_dict()
+    with span("serialize"):
+        return new_job.to_dict()
 
 
 @router.put("/{job_id}", response_model=dict)
@@ -211,7 +284,8 @@ def update_job(job_id: int, job_update: JobUpdate, db: Session = Depends(get_db)
     """
     Update an existing job posting
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    with span("db.query"):
+        job = db.query(Job).filter(Job.id == job_id).first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -221,7 +295,7 @@ def update_job(job_id: int, job_update: JobUpdate, db: Session = Depends(get_db)
     
     for field, value in update_data.items():
         # Convert list fields to JSON strings
-        if field in ["description", "responsibilities", "soft_skills", "qualifications"]:
+        if field in LIST_FIELDS:
             if value is not None:
                 setattr(job, field, json.dumps(value))
         elif field == "logo_url":
@@ -229,22 +303,120 @@ def update_job(job_id: int, job_update: JobUpdate, db: Session = Depends(get_db)
         else:
             setattr(job, field, value)
     
-    db.commit()
-    db.refresh(job)
+    if "location" in update_data:
+        job.update_geocoding()
+    
+    with span("db.commit"):
+        db.commit()
+    with span("db.refresh"):
+        db.refresh(job)
+    fragment_cache.invalidate_job(job_id)
     
-    return job.to_dict()
+    with span("serialize"):
+        return job.to_dict()
 
 @router.delete("/{job_id}", status_code=204)
 def delete_job(job_id: int, db: Session = Depends(get_db)):
     """
     Delete a job posting
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    with span("db.query"):
+        job = db.query(Job).filter(Job.id == job_id).first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     db.delete(job)
-    db.commit()
+    with span("db.commit"):
+        db.commit()
+    fragment_cache.invalidate_job(job_id)
     
     return None
+
+def iter_selected_batches(db: Session, selection: JobBulkSelection, columns):
+    """
+    Yield batches of (id, ...) rows selected by ids or by filter, in id order
+    Uses keyset pagination on id so each batch is an indexed range scan
+    """
+    query = db.query(Job.id, *columns)
+    if selection.ids is not None:
+        query = query.filter(Job.id.in_(selection.ids))
+    else:
+        if selection.filter.company is not None:
+            query = query.filter(Job.company == selection.filter.company)
+        if selection.filter.category is not None:
+            query = query.filter(Job.category == selection.filter.category)
+        if selection.filter.created_before is not None:
+            # created_at is stored as "YYYY-MM-DD HH:MM:SS"; datetime() formats
+            # the bound the same way so string comparison is exact at the boundary
+            query = query.filter(Job.created_at < func.datetime(selection.filter.created_before))
+    
+    last_id = 0
+    while True:
+        batch = query.filter(Job.id > last_id).order_by(Job.id).limit(BULK_BATCH_SIZE).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+@router.patch("/", response_model=dict)
+def bulk_update_jobs(bulk_update: JobBulkUpdate, db: Session = Depends(get_db)):
+    """
+    Update many jobs at once, selected by ids or by filter
+    Runs one set-based UPDATE per batch of BULK_BATCH_SIZE jobs
+    """
+    update_data = bulk_update.changes.model_dump(exclude_unset=True)
+    
+    values = {}
+    for field, value in update_data.items():
+        # Convert list fields to JSON strings
+        if field in LIST_FIELDS:
+            if value is not None:
+                values[field] = json.dumps(value)
+        elif value is not None or field == "logo_url":
+            values[field] = value
+    if not values:
+        raise HTTPException(status_code=400, detail="No changes provided")
+    if "location" in values:
+        values.update(geocode_fields(update_data["location"]))
+    
+    updated = 0
+    for batch in iter_selected_batches(db, bulk_update, []):
+        ids = [row[0] for row in batch]
+        with span("db.bulk_update"):
+            updated += db.query(Job).filter(Job.id.in_(ids)).update(values, synchronize_session=False)
+            db.commit()
+        for job_id in ids:
+            fragment_cache.invalidate_job(job_id)
+    
+    return {"updated": updated}
+
+@router.delete("/", response_model=dict)
+def bulk_delete_jobs(
+    bulk_delete: JobBulkDelete,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Delete many jobs at once, selected by ids or by filter
+    Runs one set-based DELETE per batch; uploaded logos are removed in the background
+    """
+    deleted = 0
+    logo_urls = set()
+    for batch in iter_selected_batches(db, bulk_delete, [Job.logo_url]):
+        ids = [row[0] for row in batch]
+        logo_urls.update(row[1] for row in batch if row[1])
+        with span("db.bulk_delete"):
+            deleted += db.query(Job).filter(Job.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+        for job_id in ids:
+            fragment_cache.invalidate_job(job_id)
+    
+    # Keep logos that are still used by remaining jobs
+    if logo_urls:
+        still_used = {
+            row[0] for row in db.query(Job.logo_url).filter(Job.logo_url.in_(logo_urls)).distinct()
+        }
+        background_tasks.add_task(delete_logo_files, sorted(logo_urls - still_used))
+    
+    return {"deleted": deleted}
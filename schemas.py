@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 class JobBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -35,6 +35,45 @@ class JobUpdate(BaseModel):
     soft_skills: Optional[List[str]] = Field(None, min_items=1)
     qualifications: Optional[List[str]] = Field(None, min_items=1)
 
+class JobFilter(BaseModel):
+    """Conditions for selecting jobs in bulk operations (combined with AND)"""
+    company: Optional[str] = Field(None, min_length=1, max_length=255)
+    category: Optional[str] = Field(None, min_length=1, max_length=100)
+    created_before: Optional[datetime] = None
+    
+    @field_validator("created_before")
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]):
+        # created_at is stored as naive UTC; naive input is taken as UTC too
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if self.company is None and self.category is None and self.created_before is None:
+            raise ValueError("filter must contain at least one condition")
+        return self
+
+class JobBulkSelection(BaseModel):
+    """Select jobs either by explicit ids or by a filter (not both)"""
+    ids: Optional[List[int]] = Field(None, min_items=1, max_items=10000)
+    filter: Optional[JobFilter] = None
+    
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("provide exactly one of 'ids' or 'filter'")
+        return self
+
+class JobBulkUpdate(JobBulkSelection):
+    """Schema for bulk updating jobs"""
+    changes: JobUpdate
+
+class JobBulkDelete(JobBulkSelection):
+    """Schema for bulk deleting jobs"""
+    pass
+
 class JobResponse(JobBase):
     """Schema for job responses"""
     id: int
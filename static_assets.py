@@ -0,0 +1,378 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Upload filenames are random UUIDs and never rewritten, so they can be cached forever
+UPLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Responses smaller than this are not compressed (bytes)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Precompressed siblings are only kept if they save at least this fraction of the size
+PRECOMPRESS_MIN_SAVING = 0.1
+
+# Content types worth compressing (images like png/jpeg/webp are already compressed)
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/bmp",
+}
+
+# Encodings in order of preference, with the file suffix used for precompressed siblings
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Single byte range: "first-last", "first-" or "-suffix"
+_BYTE_RANGE = re.compile(r"(\d+)-(\d*)|-(\d+)")
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def available_encodings() -> List[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def negotiate_encoding(accept_encoding: str, offered: List[str]) -> Optional[str]:
+    """
+    Pick the best encoding from `offered` (in preference order) that the
+    client accepts according to its Accept-Encoding header
+    """
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    for encoding in offered:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Precompressed upload siblings
+# ---------------------------------------------------------------------------
+
+def precompress_file(path: Path) -> List[Path]:
+    """
+    Write .gz (and .br when brotli is installed) siblings next to a file
+    if its type is compressible and compression actually saves space
+    Returns the sibling paths that were written
+    """
+    content_type, _ = mimetypes.guess_type(str(path))
+    if not is_compressible(content_type):
+        return []
+
+    data = path.read_bytes()
+    written = []
+    for encoding in available_encodings():
+        compressed = compress(data, encoding)
+        if len(compressed) > len(data) * (1 - PRECOMPRESS_MIN_SAVING):
+            continue
+        sibling = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+        sibling.write_bytes(compressed)
+        written.append(sibling)
+    return written
+
+
+def compressed_siblings(path: Path) -> List[Path]:
+    """Existing precompressed siblings of a file"""
+    siblings = [path.with_name(path.name + suffix) for suffix in ENCODING_SUFFIXES.values()]
+    return [sibling for sibling in siblings if sibling.exists()]
+
+
+# ---------------------------------------------------------------------------
+# Static files with immutable caching, strong ETags and Range support
+# ---------------------------------------------------------------------------
+
+_etags: Dict[Tuple[str, int, int], str] = {}
+_etags_lock = threading.Lock()
+MAX_CACHED_ETAGS = 4096
+
+
+def content_etag(path: str, stat_result: os.stat_result) -> str:
+    """Strong ETag from a hash of the file content (cached by path, mtime and size)"""
+    key = (path, stat_result.st_mtime_ns, stat_result.st_size)
+    with _etags_lock:
+        etag = _etags.get(key)
+    if etag:
+        return etag
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    etag = f'"{digest.hexdigest()[:32]}"'
+
+    with _etags_lock:
+        if len(_etags) >= MAX_CACHED_ETAGS:
+            _etags.clear()
+        _etags[key] = etag
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end)
+    Returns None if the header is malformed or asks for several ranges
+    (the full file is served instead)
+    Raises ValueError if a well-formed range can't be satisfied
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    match = _BYTE_RANGE.fullmatch(spec.strip())
+    if match is None:
+        return None
+    start_text, end_text, suffix_text = match.groups()
+    if start_text:
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+        if end_text and start > end:
+            return None  # last-byte-pos before first-byte-pos is invalid syntax
+    else:
+        suffix = int(suffix_text)
+        if suffix == 0:
+            raise ValueError("Empty suffix range")
+        start = max(0, size - suffix)
+        end = size - 1
+
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class FrontendStaticFiles(StaticFiles):
+    """StaticFiles for the frontend assets (css/js/images); answers 404 while they are not deployed"""
+
+    async def check_config(self):
+        if self.directory is not None and os.path.isdir(self.directory):
+            await super().check_config()
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles for uploaded blobs:
+    - long-lived immutable Cache-Control
+    - strong content-hash ETags and If-None-Match (304)
+    - single byte Range requests (206 / 416), honoring If-Range
+    - precompressed .br/.gz siblings served by Accept-Encoding negotiation
+      (never directly, they carry no Content-Encoding on their own)
+    """
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        if path.endswith(tuple(ENCODING_SUFFIXES.values())):
+            raise HTTPException(status_code=404)
+
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except PermissionError:
+            raise HTTPException(status_code=401)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        # Hashing a large file must not block the event loop
+        etag = await anyio.to_thread.run_sync(content_etag, str(full_path), stat_result)
+        return self.file_response(full_path, stat_result, scope, etag=etag)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200, etag: Optional[str] = None) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        if etag is None:
+            etag = content_etag(full_path, stat_result)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        headers = {
+            "cache-control": UPLOAD_CACHE_CONTROL,
+            "accept-ranges": "bytes",
+            "vary": "Accept-Encoding",
+        }
+
+        # Byte ranges are always served from the identity (uncompressed) file
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and status_code == 200 and (not if_range or if_range == etag):
+            size = stat_result.st_size
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+            if byte_range:
+                start, end = byte_range
+                return StreamingResponse(
+                    iter_file_range(full_path, start, end),
+                    status_code=206,
+                    media_type=media_type,
+                    headers={
+                        **headers,
+                        "etag": etag,
+                        "content-range": f"bytes {start}-{end}/{size}",
+                        "content-length": str(end - start + 1),
+                    },
+                )
+
+        # Precompressed sibling, if one exists and the client accepts it
+        offered = [
+            encoding for encoding in ENCODING_SUFFIXES
+            if os.path.exists(full_path + ENCODING_SUFFIXES[encoding])
+        ]
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), offered) if offered else None
+        if encoding:
+            etag = etag[:-1] + f'-{encoding}"'
+            headers["content-encoding"] = encoding
+
+        headers["etag"] = etag
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            headers.pop("content-encoding", None)
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            return FileResponse(
+                full_path + ENCODING_SUFFIXES[encoding],
+                status_code=status_code,
+                headers=headers,
+                media_type=media_type,
+            )
+        return FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Response compression middleware
+# ---------------------------------------------------------------------------
+
+class CompressionMiddleware:
+    """
+    Compress compressible responses (JSON, text, HTML) larger than
+    `minimum_size`, using the best encoding the client accepts
+    (brotli when installed, otherwise gzip).
+    Already-encoded, partial and streamed responses are passed through.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), available_encodings())
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                start_message = message
+                passthrough = (
+                    message["status"] in (204, 206, 304)
+                    or "content-encoding" in headers
+                    or not is_compressible(headers.get("content-type"))
+                )
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough or start_message is None:
+                await send(message)
+                return
+
+            # First body message decides: small or streamed responses go out as-is
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            passthrough = True
+            if more_body or len(body) < self.minimum_size:
+                await send(start_message)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["etag"] = headers["etag"].rstrip('"') + f'-{encoding}"'
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import admission
+import fragment_cache
+import main
+from database import get_db
+from migrations import run_migrations
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a migrated temporary database"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    raw_connection = engine.raw_connection()
+    try:
+        run_migrations(raw_connection.driver_connection)
+    finally:
+        raw_connection.close()
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    """App client on the temporary database (lifespan not run)"""
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Endpoint tests make many requests from one client address
+    monkeypatch.setattr(admission, "PRIORITY_LANES", set(admission.LANE_LIMITS))
+    fragment_cache.clear()
+    monkeypatch.setattr(fragment_cache, "_synced_seq", -1)
+    main.app.dependency_overrides[get_db] = get_test_db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
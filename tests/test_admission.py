@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import admission
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+# Only used to match route templates (scope["app"])
+ROUTER = Starlette(routes=[
+    Route("/api/jobs/", endpoint),
+    Route("/api/jobs/{job_id}", endpoint),
+    Route("/health", endpoint),
+])
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setattr(admission, "LANE_LIMITS", {"health": 2, "static": 2, "api_read": 4, "api_write": 1})
+    monkeypatch.setattr(admission, "ROUTE_LIMITS", {})
+    monkeypatch.setattr(admission, "DEFAULT_ROUTE_LIMIT", 4)
+    monkeypatch.setattr(admission, "LATENCY_BUDGET", 0.05)
+    monkeypatch.setattr(admission, "RATE_PER_SECOND", 1.0)
+    monkeypatch.setattr(admission, "RATE_BURST", 100.0)
+    monkeypatch.setattr(admission, "TRUSTED_PROXIES", set())
+    return monkeypatch
+
+
+def make_middleware(blocked: asyncio.Event = None, blocked_paths=()):
+    async def app(scope, receive, send):
+        if scope["path"] in blocked_paths:
+            await blocked.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return admission.AdmissionControlMiddleware(app)
+
+
+async def request(middleware, path, method="GET", client="198.51.100.1", headers=()):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": (client, 50000),
+        "app": ROUTER,
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+def test_client_over_rate_gets_429(settings):
+    settings.setattr(admission, "RATE_BURST", 2.0)
+
+    async def run():
+        middleware = make_middleware()
+        return [await request(middleware, "/api/jobs/") for _ in range(3)]
+
+    results = asyncio.run(run())
+    assert [status for status, _ in results] == [200, 200, 429]
+    assert results[2][1][b"retry-after"] == b"1"
+
+
+def test_priority_lanes_are_not_rate_limited(settings):
+    settings.setattr(admission, "RATE_BURST", 1.0)
+
+    async def run():
+        middleware = make_middleware()
+        return [await request(middleware, path) for path in ("/health", "/health", "/uploads/a.png", "/uploads/a.png")]
+
+    assert [status for status, _ in asyncio.run(run())] == [200, 200, 200, 200]
+
+
+def test_saturated_lane_sheds_with_503(settings):
+    settings.setattr(admission, "DEFAULT_ROUTE_LIMIT", 10)
+
+    async def run():
+        release = asyncio.Event()
+        middleware = make_middleware(release, {"/api/jobs/1", "/api/jobs/2", "/api/jobs/3", "/api/jobs/4"})
+        holders = [asyncio.create_task(request(middleware, f"/api/jobs/{i}")) for i in range(1, 5)]
+        await asyncio.sleep(0.01)
+        shed = await request(middleware, "/api/jobs/5")
+        health = await request(middleware, "/health")
+        stats = admission.get_stats()
+        release.set()
+        await asyncio.gather(*holders)
+        return shed, health, stats
+
+    (status, headers), (health_status, _), stats = asyncio.run(run())
+    assert status == 503
+    assert headers[b"retry-after"] == b"1"
+    assert health_status == 200  # the health lane is independent of the API lanes
+    assert stats["lanes"]["api_read"]["active"] == 4
+
+
+def test_route_limit_leaves_other_routes_admitted(settings):
+    settings.setattr(admission, "ROUTE_LIMITS", {"GET /api/jobs/": 1})
+
+    async def run():
+        release = asyncio.Event()
+        middleware = make_middleware(release, {"/api/jobs/"})
+        holder = asyncio.create_task(request(middleware, "/api/jobs/"))
+        await asyncio.sleep(0.01)
+        same_route = await request(middleware, "/api/jobs/")
+        other_route = await request(middleware, "/api/jobs/7")
+        release.set()
+        await holder
+        return same_route[0], other_route[0], middleware.lanes["api_read"].active
+
+    assert asyncio.run(run()) == (503, 200, 0)
+
+
+def test_forwarded_for_identifies_clients_behind_trusted_proxy(settings):
+    settings.setattr(admission, "RATE_BURST", 1.0)
+    settings.setattr(admission, "TRUSTED_PROXIES", {"10.0.0.1"})
+
+    async def run():
+        middleware = make_middleware()
+        via_proxy = [
+            await request(middleware, "/api/jobs/", client="10.0.0.1", headers=[("x-forwarded-for", f"203.0.113.{i}, 10.0.0.1")])
+            for i in (1, 2, 1)
+        ]
+        # X-Forwarded-For from an untrusted peer is ignored
+        direct = [
+            await request(middleware, "/api/jobs/", client="198.51.100.9", headers=[("x-forwarded-for", f"203.0.113.{i}")])
+            for i in (3, 4)
+        ]
+        return [status for status, _ in via_proxy + direct]
+
+    assert asyncio.run(run()) == [200, 200, 429, 200, 429]
@@ -0,0 +1,103 @@
+from sqlalchemy import text
+
+import routes
+
+JOB = {
+    "title": "Accountant",
+    "company": "Acme",
+    "location": "Cairo",
+    "experience": "2-3 years",
+    "salary": "20,000 EGP",
+    "type": "Hybrid",
+    "category": "Accounting",
+    "description": ["Description"],
+    "responsibilities": ["Responsibility"],
+    "soft_skills": ["Skill"],
+    "qualifications": ["Qualification"],
+}
+
+
+def create_jobs(client, count: int, **fields) -> list:
+    return [client.post("/api/jobs/", json={**JOB, **fields}).json()["id"] for _ in range(count)]
+
+
+def remaining(client) -> dict:
+    return {job["id"]: job for job in client.get("/api/jobs/").json()}
+
+
+def test_update_by_ids(client):
+    ids = create_jobs(client, 4)
+    response = client.request("PATCH", "/api/jobs/", json={"ids": [ids[0], ids[2]], "changes": {"category": "Audit"}})
+    assert response.json() == {"updated": 2}
+    assert [job["category"] for job in remaining(client).values()] == ["Audit", "Accounting", "Audit", "Accounting"]
+
+
+def test_delete_by_filter(client):
+    create_jobs(client, 2, company="Acme")
+    kept = create_jobs(client, 2, company="Other")
+    response = client.request("DELETE", "/api/jobs/", json={"filter": {"company": "Acme"}})
+    assert response.json() == {"deleted": 2}
+    assert list(remaining(client)) == kept
+
+
+def test_selection_must_be_ids_or_filter(client):
+    create_jobs(client, 1)
+    for body in ({"ids": [1], "filter": {"company": "Acme"}}, {}, {"filter": {}}):
+        assert client.request("DELETE", "/api/jobs/", json=body).status_code == 422
+    assert client.request("PATCH", "/api/jobs/", json={"ids": [1], "changes": {}}).status_code == 400
+    assert len(remaining(client)) == 1
+
+
+def test_batches_cover_every_selected_job(client, monkeypatch):
+    monkeypatch.setattr(routes, "BULK_BATCH_SIZE", 3)
+    create_jobs(client, 10, company="Acme")
+    create_jobs(client, 2, company="Other")
+
+    response = client.request("PATCH", "/api/jobs/", json={"filter": {"company": "Acme"}, "changes": {"salary": "30,000 EGP"}})
+    assert response.json() == {"updated": 10}
+    assert sum(job["salary"] == "30,000 EGP" for job in remaining(client).values()) == 10
+
+    response = client.request("DELETE", "/api/jobs/", json={"filter": {"company": "Acme"}})
+    assert response.json() == {"deleted": 10}
+    assert len(remaining(client)) == 2
+
+
+def test_created_before_boundary_and_timezone(client, session_factory):
+    older, boundary, newer = create_jobs(client, 3)
+    db = session_factory()
+    for job_id, created_at in ((older, "2026-01-01 03:00:00"), (boundary, "2026-01-01 03:32:00"), (newer, "2026-01-01 04:00:00")):
+        db.execute(text("UPDATE jobs SET created_at = :created_at WHERE id = :id"), {"created_at": created_at, "id": job_id})
+    db.commit()
+    db.close()
+
+    def matching(created_before: str) -> int:
+        body = {"filter": {"created_before": created_before}, "changes": {"title": "Matched"}}
+        return client.request("PATCH", "/api/jobs/", json=body).json()["updated"]
+
+    assert matching("2026-01-01T03:32:00") == 1  # strictly before
+    assert matching("2026-01-01T03:32:01") == 2
+    # 05:02:41+02:00 is 03:02:41 UTC
+    assert matching("2026-01-01T05:02:41+02:00") == 1
+    assert matching("2026-01-01T03:32:00Z") == 1
+
+    response = client.request("DELETE", "/api/jobs/", json={"filter": {"created_before": "2026-01-01T05:02:41+02:00"}})
+    assert response.json() == {"deleted": 1}
+    assert sorted(remaining(client)) == [boundary, newer]
+
+
+def test_delete_keeps_logos_still_in_use(client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    for name in ("shared.png", "only.png"):
+        (uploads / name).write_bytes(b"logo")
+
+    create_jobs(client, 2, company="Acme", logo_url="/uploads/shared.png")
+    create_jobs(client, 1, company="Acme", logo_url="/uploads/only.png")
+    create_jobs(client, 1, company="Other", logo_url="/uploads/shared.png")
+    create_jobs(client, 1, company="Acme", logo_url="https://example.com/logo.png")
+
+    response = client.request("DELETE", "/api/jobs/", json={"filter": {"company": "Acme"}})
+    assert response.json() == {"deleted": 4}
+    assert (uploads / "shared.png").exists()
+    assert not (uploads / "only.png").exists()
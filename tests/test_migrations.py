@@ -0,0 +1,83 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import migrations
+from migrations import LATEST_VERSION, MIGRATIONS, Migration, checksum, get_schema_version, run_migrations
+
+BASELINE_DB = Path(__file__).resolve().parent.parent / "jobs.db"
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(str(path))
+
+
+def test_migrates_baseline_database(tmp_path):
+    db_path = tmp_path / "jobs.db"
+    shutil.copy(BASELINE_DB, db_path)
+    conn = connect(db_path)
+
+    assert run_migrations(conn) == [migration.version for migration in MIGRATIONS]
+    assert get_schema_version(conn) == LATEST_VERSION
+
+    recorded = dict(conn.execute("SELECT version, checksum FROM schema_migrations"))
+    assert recorded == {migration.version: checksum(migration) for migration in MIGRATIONS}
+
+    # Existing rows are kept and geocoded by the Python step
+    places = dict(conn.execute("SELECT id, place FROM jobs"))
+    assert len(places) == 6
+    assert places[3] == "Cairo"
+    assert places[1] is None
+
+
+def test_up_to_date_database_takes_fast_path(tmp_path):
+    conn = connect(tmp_path / "jobs.db")
+    assert run_migrations(conn) == [migration.version for migration in MIGRATIONS]
+
+    # Nothing is read or created once user_version matches
+    conn.execute("DROP TABLE schema_migrations")
+    assert run_migrations(conn) == []
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'schema_migrations'").fetchone() is None
+
+
+def test_changed_migration_is_rejected(tmp_path, monkeypatch):
+    conn = connect(tmp_path / "jobs.db")
+    run_migrations(conn)
+
+    changed = list(MIGRATIONS)
+    changed[2] = Migration(3, "index jobs by creation time", ["CREATE INDEX IF NOT EXISTS ix_jobs_created ON jobs (created_at)"])
+    changed.append(Migration(LATEST_VERSION + 1, "new migration", ["CREATE TABLE extra (id INTEGER)"]))
+    monkeypatch.setattr(migrations, "MIGRATIONS", changed)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION + 1)
+
+    with pytest.raises(RuntimeError, match="Migration 3"):
+        run_migrations(conn)
+
+    # Rolled back: nothing from the new migration was applied
+    assert get_schema_version(conn) == LATEST_VERSION
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'extra'").fetchone() is None
+
+
+def test_python_steps_are_checksummed_by_identifier():
+    @migrations.python_step(version=1)
+    def step(conn):
+        pass
+
+    first = checksum(Migration(9, "python step", [step]))
+
+    @migrations.python_step(version=1)
+    def step(conn):
+        conn.execute("SELECT 1")
+
+    assert checksum(Migration(9, "python step", [step])) == first
+
+    @migrations.python_step(version=2)
+    def step(conn):
+        pass
+
+    assert checksum(Migration(9, "python step", [step])) != first
+
+    with pytest.raises(TypeError):
+        checksum(Migration(9, "python step", [lambda conn: None]))
@@ -0,0 +1,46 @@
+import json
+import re
+
+JOB = {
+    "title": "</script><b>Accountant",
+    "company": "Acme",
+    "location": "Maadi, Cairo",
+    "experience": "2-3 years",
+    "salary": "20,000 EGP",
+    "type": "Hybrid",
+    "category": "Accounting",
+    "description": ["Description"],
+    "responsibilities": ["Responsibility"],
+    "soft_skills": ["Skill"],
+    "qualifications": ["Qualification"],
+}
+
+
+def initial_data(html: str):
+    match = re.search(r"<script>window.__INITIAL_DATA__ = (.*?);</script>", html)
+    return json.loads(match.group(1))
+
+
+def test_pages_inline_job_data(client):
+    job_id = client.post("/api/jobs/", json=JOB).json()["id"]
+
+    listing = client.get("/browse-jobs.html").text
+    assert "</script><b>" not in listing  # escaped in both the HTML and the inlined JSON
+    assert initial_data(listing)["jobs"] == client.get("/api/jobs/").json()
+
+    details = client.get(f"/job-details.html?id={job_id}").text
+    assert initial_data(details)["job"]["title"] == JOB["title"]
+    assert '<script src="/static/js/job-details.js"></script>' in details
+
+
+def test_pages_reflect_updates(client):
+    job_id = client.post("/api/jobs/", json=JOB).json()["id"]
+    assert "Accountant" in client.get("/browse-jobs.html").text
+
+    client.put(f"/api/jobs/{job_id}", json={"title": "Auditor"})
+    listing = client.get("/browse-jobs.html").text
+    assert "Auditor" in listing and "Accountant" not in listing
+
+
+def test_missing_frontend_assets_are_not_found(client):
+    assert client.get("/static/css/style.css").status_code == 404
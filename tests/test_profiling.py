@@ -0,0 +1,38 @@
+import os
+
+import profiling
+
+
+def scope_with_profile_header(value: bytes) -> dict:
+    return {"type": "http", "headers": [(b"x-profile", value)]}
+
+
+def test_profile_token_header(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0)
+
+    assert profiling.should_profile(scope_with_profile_header(b"s3cret"))
+    assert not profiling.should_profile(scope_with_profile_header(b"wrong"))
+    # Non-ASCII header values are rejected, not a TypeError (500)
+    assert not profiling.should_profile(scope_with_profile_header("s3crét".encode("latin-1")))
+
+
+def test_profile_header_ignored_without_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0)
+
+    assert not profiling.should_profile(scope_with_profile_header(b""))
+
+
+def test_old_profiles_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_MAX_KEPT", 3)
+    written = []
+    for i in range(5):
+        profile = profiling.RequestProfile("GET", "/api/jobs/")
+        profile.id = f"profile-{i}"
+        profile.write(tmp_path, 200)
+        os.utime(tmp_path / f"{profile.id}.spans.json", ns=(i * 10**9, i * 10**9))
+        written.append(profile.id)
+
+    kept = sorted(path.name for path in tmp_path.iterdir())
+    assert kept == [f"{profile_id}{suffix}" for profile_id in written[-3:] for suffix in (".folded", ".spans.json")]
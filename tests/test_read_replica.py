@@ -0,0 +1,150 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import read_replica
+import routes
+from migrations import run_migrations
+from models import Job
+
+LOCATIONS = ["Cairo", "Maadi, Cairo", "New Cairo", "Giza", "Alexandria", "Remote", "Tanta", "100% Remote"]
+TYPES = ["On-site", "Hybrid", "Remote"]
+CATEGORIES = ["Sales", "Software", "Design"]
+
+# (type, city, category) combinations compared between both paths
+FILTERS = [
+    (None, None, None),
+    ("Remote", None, None),
+    (None, None, "Software"),
+    (None, "Cairo", None),
+    ("Hybrid", "Giza", None),
+    (None, "remote", "Design"),  # no gazetteer place: location substring match
+    (None, "%", None),  # LIKE wildcards match literally
+    (None, "_", None),
+]
+SKIPS = (0, 3, 10)
+PAGE_SIZE = 5
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(read_replica, "ENABLED", False)  # get_jobs takes the SQL path
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    raw_connection = engine.raw_connection()
+    try:
+        run_migrations(raw_connection.driver_connection)
+    finally:
+        raw_connection.close()
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def replica():
+    return read_replica.JobReplica()
+
+
+def add_jobs(db, count: int, offset: int = 0):
+    for i in range(offset, offset + count):
+        job = Job(
+            title=f"Job {i}",
+            company=f"Company {i % 4}",
+            location=LOCATIONS[i % len(LOCATIONS)],
+            experience="1-2 years",
+            salary="10,000 EGP",
+            type=TYPES[i % len(TYPES)],
+            category=CATEGORIES[i % len(CATEGORIES)],
+            description=json.dumps(["Description"]),
+            responsibilities=json.dumps(["Responsibility"]),
+            soft_skills=json.dumps(["Skill"]),
+            qualifications=json.dumps(["Qualification"]),
+        )
+        job.update_geocoding()
+        db.add(job)
+    db.commit()
+
+
+def assert_same_pages(db, replica):
+    for type, city, category in FILTERS:
+        for skip in SKIPS:
+            expected = routes.get_jobs(
+                type=type, city=city, category=category, near=None, radius_km=30,
+                skip=skip, limit=PAGE_SIZE, db=db
+            )
+            actual = replica.list_jobs(db, type, city, category, skip, PAGE_SIZE)
+            assert actual == expected, (type, city, category, skip)
+
+
+def test_matches_sql_after_inserts(db, replica):
+    add_jobs(db, 40)
+    assert_same_pages(db, replica)
+
+    add_jobs(db, 15, offset=40)
+    assert_same_pages(db, replica)
+    assert len(replica.ids) == 55
+
+
+def test_matches_sql_after_updates_and_deletes(db, replica):
+    add_jobs(db, 60)
+    assert_same_pages(db, replica)
+
+    for job in db.query(Job).filter(Job.id % 5 == 0):
+        job.location = "Giza"
+        job.category = "Design"
+        job.update_geocoding()
+    db.query(Job).filter(Job.id.in_([3, 17, 30])).delete(synchronize_session=False)
+    db.commit()
+
+    assert_same_pages(db, replica)
+    assert replica.deleted == 3  # applied incrementally, deleted rows kept as tombstones
+
+
+def test_id_reused_after_max_id_deleted(db, replica):
+    add_jobs(db, 20)
+    assert_same_pages(db, replica)
+
+    db.query(Job).filter(Job.id == 20).delete()
+    db.commit()
+    assert_same_pages(db, replica)
+
+    # jobs.id is not AUTOINCREMENT, so SQLite hands out the deleted max id again
+    add_jobs(db, 1, offset=100)
+    assert db.query(Job.id).filter(Job.title == "Job 100").scalar() == 20
+    assert_same_pages(db, replica)
+
+
+def test_change_log_pruned_without_replica(db, replica):
+    add_jobs(db, 30)
+    assert_same_pages(db, replica)
+    applied_seq = replica.applied_seq
+
+    # Many writes with nobody following the log
+    db.execute(
+        text("UPDATE jobs SET salary = :salary WHERE id = :id"),
+        [{"salary": f"{n} EGP", "id": n % 30 + 1} for n in range(12000)],
+    )
+    db.commit()
+
+    remaining, oldest = db.execute(text("SELECT COUNT(*), MIN(seq) FROM job_changes")).one()
+    assert remaining <= 11000
+    assert oldest > applied_seq + 1
+
+    # The replica fell behind the pruned log and reloads
+    assert_same_pages(db, replica)
+    assert replica.list_jobs(db, None, None, None, 0, 30)[0]["salary"] == "11970 EGP"
+
+
+def test_change_log_records_writes(db):
+    add_jobs(db, 2)
+    job = db.query(Job).filter(Job.id == 1).one()
+    job.title = "Changed"
+    db.commit()
+    db.query(Job).filter(Job.id == 2).delete()
+    db.commit()
+
+    logged = [row[0] for row in db.execute(text("SELECT job_id FROM job_changes ORDER BY seq"))]
+    assert logged == [1, 2, 1, 2]  # insert, insert, update, delete
@@ -0,0 +1,71 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from static_assets import UploadStaticFiles, parse_range, precompress_file
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg">' + b'<rect width="10" height="10"/>' * 200 + b"</svg>"
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    (tmp_path / "logo.svg").write_bytes(SVG)
+    (tmp_path / "logo.png").write_bytes(bytes(range(256)) * 8)
+    return tmp_path
+
+
+@pytest.fixture
+def client(uploads):
+    app = Starlette(routes=[Mount("/uploads", UploadStaticFiles(directory=uploads))])
+    return TestClient(app)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-5", 100) == (95, 99)
+    # Malformed or multiple ranges: serve the full file
+    for header in ("bytes=abc", "bytes=5-3", "bytes=-", "bytes=0-1,5-6", "items=0-1"):
+        assert parse_range(header, 100) is None
+    # Well-formed but unsatisfiable
+    for header in ("bytes=100-", "bytes=-0"):
+        with pytest.raises(ValueError):
+            parse_range(header, 100)
+
+
+def test_etag_and_ranges(client):
+    response = client.get("/uploads/logo.png")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+
+    assert client.get("/uploads/logo.png", headers={"If-None-Match": etag}).status_code == 304
+
+    partial = client.get("/uploads/logo.png", headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == response.content[10:20]
+    assert client.get("/uploads/logo.png", headers={"Range": "bytes=abc"}).status_code == 200
+    assert client.get("/uploads/logo.png", headers={"Range": "bytes=5000-"}).status_code == 416
+
+
+def test_precompressed_siblings(uploads, client):
+    assert precompress_file(uploads / "logo.png") == []
+    siblings = precompress_file(uploads / "logo.svg")
+    assert uploads / "logo.svg.gz" in siblings
+
+    response = client.get("/uploads/logo.svg", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == SVG  # decoded by the client
+    assert response.headers["etag"].endswith('-gzip"')
+
+    identity = client.get("/uploads/logo.svg", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.content == SVG
+    assert gzip.decompress((uploads / "logo.svg.gz").read_bytes()) == SVG
+
+    # Siblings are only served through negotiation
+    assert client.get("/uploads/logo.svg.gz").status_code == 404
+    assert client.get("/uploads/logo.svg.br").status_code == 404